@@ -2,7 +2,7 @@ import os
 import streamlit as st
 from pathlib import Path
 from dotenv import load_dotenv
-from rag.pipeline import CareerRAG
+from rag.pipeline import ANSWER_ERROR, CareerRAG
 
 # Configure page
 st.set_page_config(
@@ -16,66 +16,80 @@ st.set_page_config(
 load_dotenv()
 
 # Custom CSS
-st.markdown("""
-    <style>
-    .main {
-        padding: 2rem;
-    }
-    .stTextInput>div>div>input {
-        font-size: 1.2rem;
-    }
-    .stButton>button {
-        width: 100%;
-        font-size: 1.2rem;
-        padding: 0.5rem 1rem;
-    }
-    .role-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-    }
-    .skill-list {
-        margin: 0.5rem 0;
-    }
-    .transition-path {
-        background-color: #e6f3ff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-def initialize_rag():
-    """Initialize the RAG pipeline."""
-    if 'rag' not in st.session_state:
-        with st.spinner('Initializing career assistant...'):
-            st.session_state.rag = CareerRAG()
+STATIC_DIR = Path(__file__).parent / "static"
 
-def display_role_info(role_info):
-    """Display role information in a formatted card."""
-    st.markdown(f"""
+@st.cache_resource
+def load_css():
+    """Read the stylesheet once and return it as a style block."""
+    return f"<style>{(STATIC_DIR / 'style.css').read_text()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# HTML templates for the role and transition cards
+ROLE_TEMPLATE = """
         <div class="role-card">
-            <h3>{role_info['name']}</h3>
-            <p><strong>Levels:</strong> {', '.join(role_info['levels'])}</p>
+            <h3>{name}</h3>
+            <p><strong>Levels:</strong> {levels}</p>
             <div class="skill-list">
                 <strong>Required Skills:</strong>
                 <ul>
-                    {''.join(f'<li>{skill}</li>' for skill in role_info['skills'])}
+                    {skills}
                 </ul>
             </div>
         </div>
-    """, unsafe_allow_html=True)
-
-def display_transition_path(path_info):
-    """Display transition path information."""
-    st.markdown(f"""
+    """
+SKILL_LI = '<li>{}</li>'
+TRANSITION_TEMPLATE = """
         <div class="transition-path">
             <h3>Transition Path</h3>
             {path_info}
         </div>
-    """, unsafe_allow_html=True)
+    """
+
+@st.cache_resource(show_spinner='Initializing career assistant...')
+def get_rag():
+    """Initialize the RAG pipeline once and share it across all sessions."""
+    return CareerRAG()
+
+@st.cache_data(ttl=3600)
+def get_role_info(role):
+    """Get role information, cached per role."""
+    return get_rag().get_role_info(role)
+
+@st.cache_data(ttl=3600)
+def get_transition_paths(pairs):
+    """Get transition paths for the given role pairs, cached per pair list."""
+    return get_rag().get_transition_paths_batch(pairs)
+
+class _AnswerFailed(Exception):
+    """Raised inside the cached answer so a failed answer is never cached."""
+
+@st.cache_data(ttl=3600)
+def _get_cached_answer(question):
+    """Get the answer and its supporting documents, cached per question."""
+    answer, resources = get_rag().answer_question_with_docs(question)
+    if answer == ANSWER_ERROR:
+        raise _AnswerFailed()
+    return answer, resources
+
+def get_answer(question):
+    """Get the answer for a question, retrying the backend after a failure."""
+    try:
+        return _get_cached_answer(question)
+    except _AnswerFailed:
+        return ANSWER_ERROR, []
+
+def display_role_info(role_info):
+    """Display role information in a formatted card."""
+    st.markdown(ROLE_TEMPLATE.format(
+        name=role_info['name'],
+        levels=', '.join(role_info['levels']),
+        skills=''.join(SKILL_LI.format(skill) for skill in role_info['skills'])
+    ), unsafe_allow_html=True)
+
+def display_transition_path(path_info):
+    """Display transition path information."""
+    st.markdown(TRANSITION_TEMPLATE.format(path_info=path_info), unsafe_allow_html=True)
 
 def display_answer(answer):
     """Display the answer with formatted paragraphs and lists."""
@@ -96,7 +110,7 @@ def display_resources(resources):
 
 def main():
     # Initialize RAG pipeline
-    initialize_rag()
+    get_rag()
     
     # Header
     st.title("🚀 AskCareer: Your Engineering Path Coach")
@@ -134,14 +148,13 @@ def main():
         
         if question:
             with st.spinner('Analyzing your question...'):
-                # Get answer from RAG pipeline
-                answer = st.session_state.rag.answer_question(question)
+                # Get answer and resources from RAG pipeline in one pass
+                answer, resources = get_answer(question)
                 
                 # Display answer
                 display_answer(answer)
                 
                 # Display resources
-                resources = st.session_state.rag._get_relevant_documents(question)
                 display_resources(resources)
     
     with col2:
@@ -155,17 +168,19 @@ def main():
         if role:
             with st.spinner('Loading role information...'):
                 # Get role information
-                role_info = st.session_state.rag.get_role_info(role)
+                role_info = get_role_info(role)
                 if role_info:
                     display_role_info(role_info)
                 
                 # Get transition paths
                 st.header("Possible Transitions")
-                for target_role in ["Data Engineer", "BI Engineer", "Data Analyst", "Machine Learning Engineer"]:
-                    if target_role != role:
-                        path_info = st.session_state.rag.get_transition_path(role, target_role)
-                        if path_info:
-                            display_transition_path(path_info)
+                roles = ["Data Engineer", "BI Engineer", "Data Analyst", "Machine Learning Engineer"]
+                pairs = [(role, target_role) for target_role in roles if target_role != role]
+                transitions = get_transition_paths(pairs)
+                for pair in pairs:
+                    path_info = transitions.get(pair)
+                    if path_info:
+                        display_transition_path(path_info)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Shared embedding model for the RAG pipeline and the utility scripts.
+"""
+import os
+import logging
+from functools import lru_cache
+import torch
+import sentence_transformers
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Sentences per forward pass when embedding document batches
+ENCODE_BATCH_SIZE = 64
+
+# Let the fast tokenizer use its thread pool unless configured otherwise
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+def _encodes_bf16() -> bool:
+    """Whether sentence-transformers can return bf16 outputs as numpy arrays (3.0+)."""
+    return int(sentence_transformers.__version__.split(".")[0]) >= 3
+
+@lru_cache(maxsize=None)
+def get_embeddings(
+    model_name: str = EMBEDDING_MODEL, half_precision: bool = True, cpu_bf16: bool = False
+) -> HuggingFaceEmbeddings:
+    """Load the embedding model once per process and precision and return the shared instance.
+    
+    With half_precision the model runs in fp16 on a GPU; cpu_bf16 opts into bf16 on
+    CPU. Each combination is a separate instance, so callers never see a model
+    cast by someone else. Set HF_HUB_OFFLINE=1 before launch to skip Hub checks
+    once the model is in the local cache.
+    """
+    logger.info(f"Loading embedding model {model_name}...")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": device},
+        encode_kwargs={"batch_size": ENCODE_BATCH_SIZE}
+    )
+    if device == "cuda" and half_precision:
+        # Cast after loading; a torch_dtype load argument needs sentence-transformers 3
+        embeddings.client.half()
+        logger.info("Embedding with fp16 on GPU")
+    elif device == "cpu" and cpu_bf16:
+        if _encodes_bf16():
+            embeddings.client.to(torch.bfloat16)
+            logger.info("Embedding with bf16 on CPU")
+        else:
+            logger.warning("bf16 needs sentence-transformers 3 or later, embedding in fp32")
+    return embeddings
@@ -0,0 +1,53 @@
+"""
+ONNX Runtime embeddings for the int8-quantized MiniLM model.
+"""
+from pathlib import Path
+from typing import List
+import numpy as np
+import onnxruntime as ort
+from langchain_core.embeddings import Embeddings
+from transformers import AutoTokenizer
+
+ONNX_MODEL_FILE = "model.onnx"
+MAX_SEQ_LENGTH = 256
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed with an exported ONNX model instead of PyTorch."""
+
+    def __init__(self, model_dir: Path, batch_size: int = 32):
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.session = ort.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE),
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run the model, mean-pool and L2-normalize a batch of texts."""
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=MAX_SEQ_LENGTH,
+            return_tensors="np"
+        )
+        inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+        
+        # Mean pooling over non-padding tokens, as in sentence-transformers
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents in batches."""
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed(texts[start:start + self.batch_size]).tolist())
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._embed([text])[0].tolist()
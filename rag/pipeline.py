@@ -1,14 +1,20 @@
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+import ahocorasick
+import faiss
+import numpy as np
 from dotenv import load_dotenv
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain.schema import Document
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, RoutingControl
+from rag.embeddings import EMBEDDING_MODEL, get_embeddings
+from rag.onnx_embeddings import OnnxEmbeddings, ONNX_MODEL_FILE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,7 +23,51 @@ logger = logging.getLogger(__name__)
 # Constants
 ROOT_DIR = Path(__file__).parent.parent
 VECTOR_STORE_DIR = ROOT_DIR / "rag" / "vector_store"
-EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_MODEL_DIR = ROOT_DIR / "rag" / "models" / "minilm-int8"
+HNSW_INDEX_FILE = VECTOR_STORE_DIR / "index.hnsw"
+
+# Above this many vectors an HNSW graph beats brute-force search
+HNSW_THRESHOLD = 2000
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 8
+
+# Neo4j connections; also the number of graph fetches that can run at once
+NEO4J_POOL_SIZE = 16
+
+QUERY_CACHE_SIZE = 256
+GRAPH_CONTEXT_CACHE_SIZE = 512
+EXTRACTION_CACHE_SIZE = 1024
+
+# Seconds before cached graph results are reloaded; matches the app's cache_data TTL
+GRAPH_CACHE_TTL = 3600
+
+# Vocabularies recognized in user queries
+ROLES = ["BI Engineer", "Data Engineer", "Data Analyst", "Machine Learning Engineer"]
+SKILLS = [
+    "Python", "SQL", "Power BI", "Tableau", "Data Warehousing",
+    "ETL Processes", "Statistics", "Machine Learning", "Deep Learning",
+    "MLOps", "Cloud Platforms"
+]
+
+NO_GRAPH_CONTEXT = "No specific roles or skills mentioned in the query."
+ANSWER_ERROR = "I encountered an error while processing your question. Please try again."
+
+# Answer block for one retrieved document
+_DOC_FMT = "\nResource {i}:\nSource: {src}\nContent: {body}..."
+
+def _build_automaton(terms: List[str]) -> ahocorasick.Automaton:
+    """Compile lowercased terms into an Aho-Corasick automaton that yields the original term."""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term.lower(), term)
+    automaton.make_automaton()
+    return automaton
+
+# Compile the role and skill vocabularies once for single-pass extraction
+_ROLE_AC = _build_automaton(ROLES)
+_SKILL_AC = _build_automaton(SKILLS)
+_ROLE_WORDS = [(role, tuple(role.lower().split())) for role in ROLES]
 
 class CareerRAG:
     def __init__(self):
@@ -34,72 +84,159 @@ class CareerRAG:
             raise ValueError("NEO4J_PASSWORD environment variable is required")
         
         # Initialize vector store
-        self.embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-        self.vector_store = FAISS.load_local(
-            str(VECTOR_STORE_DIR),
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
+        self.embeddings = self._load_embeddings()
+        self._index, self._docs = self._build_search_index(self._load_vector_store())
         
-        # Initialize Neo4j driver
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        # Initialize Neo4j driver with a small pool sized for this read-only workload
+        self.driver = GraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=NEO4J_POOL_SIZE,
+            connection_acquisition_timeout=10,
+            max_transaction_retry_time=5,
+            keep_alive=True,
+            fetch_size=1000
+        )
         
         # Cache for role and skill information
         self._role_cache = {}
         self._skill_cache = {}
+        self._path_cache = {}
+        self._cache_lock = threading.Lock()
+        self._caches_loaded_at = time.monotonic()
         
-        # Create QA prompt
-        self.qa_prompt = self._create_qa_prompt()
-
-    def _create_qa_prompt(self) -> PromptTemplate:
-        """Create the QA prompt template."""
-        template = """You are a career development assistant helping engineers navigate their career paths.
-Use the following pieces of context to answer the question at the end.
-The context includes both unstructured content and structured knowledge from our career graph.
-
-Context from documents:
-{document_context}
-
-Context from knowledge graph:
-{graph_context}
+        # Skill sets encoded as bitmasks for cheap role comparisons
+        self._skill_id = {}
+        self._skill_names = []
+        self._role_mask = {}
+        self._mask_lock = threading.Lock()
+        
+        # Cache query embeddings so repeated questions skip the model forward pass
+        self._embed_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._compute_query_embedding)
+        
+        # Workers for fetching graph context while the vector search runs; the app shares
+        # one pipeline across sessions, so size it like the connection pool
+        self._executor = ThreadPoolExecutor(max_workers=NEO4J_POOL_SIZE, thread_name_prefix="career-rag")
+        
+        # Cache graph context per query so repeated questions skip Neo4j
+        self._graph_context_cache = lru_cache(maxsize=GRAPH_CONTEXT_CACHE_SIZE)(self._query_graph_context)
+        
+        # Make sure name lookups are index seeks rather than label scans
+        self._ensure_constraints()
+        
+        # Prefetch the whole role/skill graph so UI lookups are served from memory
+        self._warmup()
 
-Question: {question}
+    def _ensure_constraints(self) -> None:
+        """Create the name uniqueness constraints and check the planner uses them."""
+        try:
+            for label in ("Role", "Skill", "Level"):
+                self.driver.execute_query(
+                    f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.name IS UNIQUE",
+                    database_=self.database
+                )
+            
+            _, summary, _ = self.driver.execute_query(
+                "EXPLAIN MATCH (r:Role {name: $name}) RETURN r",
+                parameters_={"name": ""},
+                routing_=RoutingControl.READ,
+                database_=self.database
+            )
+            operators = self._plan_operators(summary.plan)
+            if any("IndexSeek" in operator for operator in operators):
+                logger.info("Role name lookups use an index seek")
+            else:
+                logger.warning(f"Role name lookups do not use an index: {operators}")
+        except Exception as e:
+            logger.error(f"Failed to ensure graph constraints: {str(e)}")
 
-Answer: Let me help you with that. """
+    @staticmethod
+    def _plan_operators(plan: Dict) -> List[str]:
+        """Flatten the operator types of a query plan."""
+        if not plan:
+            return []
+        operators = [plan.get("operatorType", "")]
+        for child in plan.get("children", []):
+            operators.extend(CareerRAG._plan_operators(child))
+        return operators
 
-        return PromptTemplate(
-            template=template,
-            input_variables=["document_context", "graph_context", "question"]
+    def _read(self, query: str, **params) -> List:
+        """Run a read query as a retried managed transaction and return its records."""
+        records, _, _ = self.driver.execute_query(
+            query,
+            parameters_=params,
+            routing_=RoutingControl.READ,
+            database_=self.database
         )
+        return records
+
+    def _warmup(self) -> None:
+        """Load every role with its skills and levels into the role and skill caches."""
+        try:
+            records = self._read("""
+                MATCH (r:Role)
+                OPTIONAL MATCH (r)-[:REQUIRES_SKILL]->(s:Skill)
+                OPTIONAL MATCH (r)-[:REQUIRES_LEVEL]->(l:Level)
+                RETURN r.name as name, collect(DISTINCT s.name) as skills, collect(DISTINCT l.name) as levels
+            """)
+            roles_by_skill = {}
+            for record in records:
+                self._role_cache[record['name']] = self._role_entry(record['name'], record['skills'], record['levels'])
+                for skill in record['skills']:
+                    roles_by_skill.setdefault(skill, []).append(record['name'])
+            
+            # Skills no role requires are not covered here and are fetched on demand
+            for skill, roles in roles_by_skill.items():
+                self._skill_cache[skill] = self._format_skill_info(skill, roles)
+            for role, role_info in self._role_cache.items():
+                self._role_mask[role] = self._skill_mask(role_info['skills'])
+            logger.info(f"Prefetched {len(self._role_cache)} roles and {len(self._skill_cache)} skills")
+        except Exception as e:
+            logger.error(f"Failed to prefetch graph data: {str(e)}")
 
     def answer_question(self, query: str) -> str:
         """Answer a question using both graph and vector store data."""
+        answer, _ = self.answer_question_with_docs(query)
+        return answer
+
+    def answer_question_with_docs(self, query: str) -> Tuple[str, List[Document]]:
+        """Answer a question and return the retrieved documents alongside it."""
         try:
-            # Get context from both sources
-            graph_context = self.get_graph_context(query)
+            # Get context from both sources concurrently; Neo4j IO releases the GIL
+            graph_future = self._executor.submit(self.get_graph_context, query)
             relevant_docs = self._get_relevant_documents(query)
+            graph_context = graph_future.result()
             
             # Format the answer based on the context
             answer = []
             
             # Add graph context if available
-            if graph_context and graph_context != "No specific roles or skills mentioned in the query.":
+            if graph_context and graph_context != NO_GRAPH_CONTEXT:
                 answer.append("Based on the career graph:")
                 answer.append(graph_context)
             
             # Add relevant documents
             if relevant_docs:
                 answer.append("\nAdditional Resources:")
-                for i, doc in enumerate(relevant_docs, 1):
-                    answer.append(f"\nResource {i}:")
-                    answer.append(f"Source: {doc.metadata.get('source', 'unknown')}")
-                    answer.append(f"Content: {doc.page_content[:200]}...")
+                answer.extend(
+                    _DOC_FMT.format(i=i, src=doc.metadata.get('source', 'unknown'), body=doc.page_content[:200])
+                    for i, doc in enumerate(relevant_docs, 1)
+                )
             
-            return "\n".join(answer) if answer else "I couldn't find specific information to answer your question. Please try rephrasing it or ask about specific roles or skills."
+            if not answer:
+                return "I couldn't find specific information to answer your question. Please try rephrasing it or ask about specific roles or skills.", relevant_docs
+            return "\n".join(answer), relevant_docs
             
         except Exception as e:
             logger.error(f"Failed to answer question: {str(e)}")
-            return "I encountered an error while processing your question. Please try again."
+            return ANSWER_ERROR, []
+
+    def _load_embeddings(self):
+        """Load the int8 ONNX model if it was exported, else the PyTorch model."""
+        if (ONNX_MODEL_DIR / ONNX_MODEL_FILE).exists():
+            logger.info(f"Using quantized ONNX embeddings from {ONNX_MODEL_DIR}")
+            return OnnxEmbeddings(ONNX_MODEL_DIR)
+        return get_embeddings(EMBEDDING_MODEL)
 
     def _load_vector_store(self) -> FAISS:
         """Load the FAISS vector store."""
@@ -115,39 +252,100 @@ Answer: Let me help you with that. """
             logger.error(f"Failed to load vector store: {str(e)}")
             raise
 
+    def _build_search_index(self, vector_store: FAISS) -> Tuple[faiss.Index, List[Document]]:
+        """Pick the index to search and build the matching document list.
+        
+        Quantized indexes (SQ8, or IVF-PQ with nprobe set) are searched as stored. Flat
+        indexes above HNSW_THRESHOLD vectors are served from an HNSW graph; smaller ones
+        are copied into a half-precision flat index.
+        """
+        index = vector_store.index
+        if not isinstance(index, faiss.IndexFlat):
+            # Quantized indexes are searched as stored
+            if isinstance(index, faiss.IndexIVF):
+                index.nprobe = IVF_NPROBE
+            search_index = index
+        elif index.ntotal > HNSW_THRESHOLD:
+            search_index = self._load_hnsw_index(index)
+        else:
+            # QT_fp16 keeps the vectors as float16 codes, halving their memory
+            search_index = faiss.IndexScalarQuantizer(index.d, faiss.ScalarQuantizer.QT_fp16, index.metric_type)
+            search_index.add(index.reconstruct_n(0, index.ntotal))
+        
+        docs = [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            for i in range(index.ntotal)
+        ]
+        logger.info(f"Search index built with {search_index.ntotal} vectors")
+        return search_index, docs
+
+    def _load_hnsw_index(self, index: faiss.Index) -> faiss.Index:
+        """Load the persisted HNSW index, rebuilding it if it is missing or stale."""
+        if HNSW_INDEX_FILE.exists() and HNSW_INDEX_FILE.stat().st_mtime >= (VECTOR_STORE_DIR / "index.faiss").stat().st_mtime:
+            hnsw_index = faiss.read_index(str(HNSW_INDEX_FILE))
+            if hnsw_index.ntotal == index.ntotal:
+                hnsw_index.hnsw.efSearch = HNSW_EF_SEARCH
+                return hnsw_index
+        
+        logger.info(f"Building HNSW index for {index.ntotal} vectors...")
+        hnsw_index = faiss.IndexHNSWSQ(index.d, faiss.ScalarQuantizer.QT_fp16, HNSW_M, index.metric_type)
+        vectors = index.reconstruct_n(0, index.ntotal)
+        hnsw_index.train(vectors)
+        hnsw_index.add(vectors)
+        hnsw_index.hnsw.efSearch = HNSW_EF_SEARCH
+        # Replace rather than overwrite the file, which may be hardlinked into a backup
+        temp_file = HNSW_INDEX_FILE.with_name(HNSW_INDEX_FILE.name + ".tmp")
+        faiss.write_index(hnsw_index, str(temp_file))
+        os.replace(temp_file, HNSW_INDEX_FILE)
+        return hnsw_index
+
     def _get_graph_context(self, query_type: str, **kwargs) -> str:
         """Get relevant context from the knowledge graph."""
         try:
-            with self.driver.session(database=self.database) as session:
-                if query_type == "role_skills":
-                    return session.run("""
-                        MATCH (r:Role {name: $role_name})-[:REQUIRES]->(s:Skill)
-                        RETURN collect(s.name) as skills
-                    """, role_name=kwargs['role']).single()["skills"]
-                
-                elif query_type == "transition_path":
-                    return session.run("""
-                        MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
-                        RETURN [node in nodes(path) | node.name] as path,
-                               [rel in relationships(path) | type(rel)] as relationships
-                    """, from_role=kwargs['from_role'], to_role=kwargs['to_role']).single()["path"]
-                
-                elif query_type == "skill_hierarchy":
-                    return session.run("""
-                        MATCH (s:Skill {name: $skill_name})-[:PREREQUISITE*]->(prereq:Skill)
-                        RETURN collect(prereq.name) as prerequisites
-                    """, skill_name=kwargs['skill']).single()["prerequisites"]
-                
-                return []
+            if query_type == "role_skills":
+                records = self._read("""
+                    MATCH (r:Role {name: $role_name})-[:REQUIRES]->(s:Skill)
+                    RETURN collect(s.name) as skills
+                """, role_name=kwargs['role'])
+                return records[0]["skills"]
+            
+            elif query_type == "transition_path":
+                records = self._read("""
+                    MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
+                    RETURN [node in nodes(path) | node.name] as path,
+                           [rel in relationships(path) | type(rel)] as relationships
+                """, from_role=kwargs['from_role'], to_role=kwargs['to_role'])
+                return records[0]["path"]
+            
+            elif query_type == "skill_hierarchy":
+                records = self._read("""
+                    MATCH (s:Skill {name: $skill_name})-[:PREREQUISITE*]->(prereq:Skill)
+                    RETURN collect(prereq.name) as prerequisites
+                """, skill_name=kwargs['skill'])
+                return records[0]["prerequisites"]
+            
+            return []
         except Exception as e:
             logger.error(f"Failed to get graph context: {str(e)}")
             return []
 
-    def _get_relevant_documents(self, query: str, k: int = 3) -> List[Document]:
+    def _compute_query_embedding(self, query: str) -> np.ndarray:
+        """Embed a query string as a read-only float32 vector."""
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        # Inner-product indexes rank by cosine similarity only for unit vectors
+        if self._index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(vector.reshape(1, -1))
+        vector.setflags(write=False)
+        return vector
+
+    def _get_relevant_documents(self, query: str, k: int = 3, query_vector: Optional[np.ndarray] = None) -> List[Document]:
         """Retrieve relevant documents from the vector store."""
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
-            return docs
+            if query_vector is None:
+                query_vector = self._embed_query(query)
+            query_vector = np.ascontiguousarray(query_vector, dtype=np.float32).reshape(1, -1)
+            _, indices = self._index.search(query_vector, k)
+            return [self._docs[i] for i in indices[0] if i != -1]
         except Exception as e:
             logger.error(f"Failed to retrieve documents: {str(e)}")
             raise
@@ -172,162 +370,273 @@ Answer: Let me help you with that. """
 
     def get_role_info(self, role: str) -> Dict:
         """Get detailed information about a role for the UI."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (r:Role {name: $role})
-                OPTIONAL MATCH (r)-[:REQUIRES_SKILL]->(s:Skill)
-                WITH r, collect(DISTINCT s.name) as skills
-                OPTIONAL MATCH (r)-[:REQUIRES_LEVEL]->(l:Level)
-                RETURN r.name as name, skills, collect(DISTINCT l.name) as levels
-            """, role=role)
-            record = result.single()
-            if not record:
-                return None
-            return {
-                'name': record['name'],
-                'skills': record['skills'] if record['skills'] and record['skills'][0] is not None else [],
-                'levels': record['levels'] if record['levels'] and record['levels'][0] is not None else []
-            }
+        self._expire_caches()
+        self._batch_role_info([role])
+        return self._role_cache.get(role)
+
+    def _batch_role_info(self, names: List[str]) -> None:
+        """Fetch levels and skills for all uncached roles in one query."""
+        missing = [name for name in dict.fromkeys(names) if name not in self._role_cache]
+        if not missing:
+            return
+        
+        records = self._read("""
+            UNWIND $roles AS rn
+            MATCH (r:Role {name: rn})
+            OPTIONAL MATCH (r)-[:REQUIRES_SKILL]->(s:Skill)
+            OPTIONAL MATCH (r)-[:REQUIRES_LEVEL]->(l:Level)
+            RETURN rn, collect(DISTINCT s.name) as skills, collect(DISTINCT l.name) as levels
+        """, roles=missing)
+        
+        # Roles missing from the graph are cached as None so they are not re-queried
+        found = {}
+        for record in records:
+            found[record['rn']] = self._role_entry(record['rn'], record['skills'], record['levels'])
+        for name in missing:
+            self._role_cache[name] = found.get(name)
+    
+    @staticmethod
+    def _role_entry(name: str, skills: List[str], levels: List[str]) -> Dict:
+        """Build a role cache entry from collected skill and level names."""
+        return {
+            'name': name,
+            # Sorted so the role card and the LLM context list skills in a stable order
+            'skills': tuple(sorted(skill for skill in skills if skill is not None)),
+            'levels': [level for level in levels if level is not None]
+        }
     
     def get_transition_path(self, from_role: str, to_role: str) -> str:
         """Get transition path information for the UI."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
-                RETURN [node in nodes(path) | node.name] as path,
-                       [rel in relationships(path) | type(rel)] as relationships
-            """, from_role=from_role, to_role=to_role)
-            
-            record = result.single()
-            if not record:
-                return None
-            
-            path = record['path']
-            relationships = record['relationships']
+        self._expire_caches()
+        if (from_role, to_role) in self._path_cache:
+            return self._path_cache[(from_role, to_role)]
+        
+        # Fetch the path and both roles' skills in a single round-trip
+        records = self._read("""
+            MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
+            WITH r1, r2, path
+            OPTIONAL MATCH (r1)-[:REQUIRES_SKILL]->(s1:Skill)
+            WITH r1, r2, path, collect(DISTINCT s1.name) as skills1
+            OPTIONAL MATCH (r2)-[:REQUIRES_SKILL]->(s2:Skill)
+            RETURN skills1, collect(DISTINCT s2.name) as skills2
+        """, from_role=from_role, to_role=to_role)
+        
+        record = records[0] if records else None
+        if not record:
+            self._path_cache[(from_role, to_role)] = None
+            return None
+        
+        # Get skill differences, the same way as the batch path
+        skill_diff = self._diff_masks(self._skill_mask(record['skills1']), self._skill_mask(record['skills2']))
+        self._path_cache[(from_role, to_role)] = self._format_transition(from_role, to_role, skill_diff)
+        return self._path_cache[(from_role, to_role)]
+    
+    def get_transition_paths_batch(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Get transition path information for several role pairs in one round-trip."""
+        self._expire_caches()
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in self._path_cache]
+        if missing:
+            records = self._read("""
+                UNWIND $pairs AS p
+                MATCH path = shortestPath((r1:Role {name: p.a})-[*..5]->(r2:Role {name: p.b}))
+                RETURN p.a as from_role, p.b as to_role,
+                       [node in nodes(path) | node.name] as path
+            """, pairs=[{'a': a, 'b': b} for a, b in missing])
             
-            # Get skill differences
-            skill_diff = self._get_skill_differences(session, from_role, to_role)
+            # Pairs without a path are absent from the result
+            found = {(record['from_role'], record['to_role']) for record in records}
+            skill_diffs = self._get_skill_differences_batch([pair for pair in missing if pair in found])
             
-            # Format the path information
-            info = []
-            info.append(f"From {from_role} to {to_role}:")
+            for pair in missing:
+                self._path_cache[pair] = (
+                    self._format_transition(pair[0], pair[1], skill_diffs.get(pair, {}))
+                    if pair in found else None
+                )
+        
+        return {pair: self._path_cache[pair] for pair in pairs if self._path_cache[pair] is not None}
+    
+    def _format_transition(self, from_role: str, to_role: str, skill_diff: Dict[str, List[str]]) -> str:
+        """Format the skill changes of a role transition."""
+        info = []
+        info.append(f"From {from_role} to {to_role}:")
+        
+        if skill_diff:
+            if skill_diff.get("Skills to Learn"):
+                info.append("\nSkills to Learn:")
+                info.extend([f"- {skill}" for skill in skill_diff["Skills to Learn"]])
             
-            if skill_diff:
-                if skill_diff.get("Skills to Learn"):
-                    info.append("\nSkills to Learn:")
-                    info.extend([f"- {skill}" for skill in skill_diff["Skills to Learn"]])
-                
-                if skill_diff.get("Skills to Maintain"):
-                    info.append("\nSkills to Maintain:")
-                    info.extend([f"- {skill}" for skill in skill_diff["Skills to Maintain"]])
-                
-                if skill_diff.get("Skills to Phase Out"):
-                    info.append("\nSkills to Phase Out:")
-                    info.extend([f"- {skill}" for skill in skill_diff["Skills to Phase Out"]])
+            if skill_diff.get("Skills to Maintain"):
+                info.append("\nSkills to Maintain:")
+                info.extend([f"- {skill}" for skill in skill_diff["Skills to Maintain"]])
             
-            return "\n".join(info)
+            if skill_diff.get("Skills to Phase Out"):
+                info.append("\nSkills to Phase Out:")
+                info.extend([f"- {skill}" for skill in skill_diff["Skills to Phase Out"]])
+        
+        return "\n".join(info)
     
-    def _get_skill_differences(self, session, role1: str, role2: str) -> Dict[str, List[str]]:
+    def _get_skill_differences(self, role1: str, role2: str) -> Dict[str, List[str]]:
         """Get skill differences between two roles."""
-        result = session.run("""
-            MATCH (r1:Role {name: $role1})-[:REQUIRES_SKILL]->(s1:Skill)
-            MATCH (r2:Role {name: $role2})-[:REQUIRES_SKILL]->(s2:Skill)
-            RETURN collect(DISTINCT s1.name) as skills1,
-                   collect(DISTINCT s2.name) as skills2
-        """, role1=role1, role2=role2)
-        
-        record = result.single()
-        if not record:
+        self._batch_role_info([role1, role2])
+        info1 = self._role_cache.get(role1)
+        info2 = self._role_cache.get(role2)
+        if not info1 or not info2:
             return {}
         
-        skills1 = set(record['skills1']) if record['skills1'] and record['skills1'][0] is not None else set()
-        skills2 = set(record['skills2']) if record['skills2'] and record['skills2'][0] is not None else set()
+        mask1 = self._role_mask.get(role1)
+        if mask1 is None:
+            mask1 = self._role_mask[role1] = self._skill_mask(info1['skills'])
+        mask2 = self._role_mask.get(role2)
+        if mask2 is None:
+            mask2 = self._role_mask[role2] = self._skill_mask(info2['skills'])
         
+        return self._diff_masks(mask1, mask2)
+    
+    def _diff_masks(self, mask1: int, mask2: int) -> Dict[str, List[str]]:
+        """Compare the skill bitmasks of a current and a target role."""
         return {
-            "Skills to Learn": list(skills2 - skills1),
-            "Skills to Maintain": list(skills1 & skills2),
-            "Skills to Phase Out": list(skills1 - skills2)
+            "Skills to Learn": self._skill_names_of(mask2 & ~mask1),
+            "Skills to Maintain": self._skill_names_of(mask1 & mask2),
+            "Skills to Phase Out": self._skill_names_of(mask1 & ~mask2)
         }
     
+    def _skill_mask(self, skills) -> int:
+        """Encode a set of skills as a bitmask, assigning ids to unseen skills."""
+        mask = 0
+        with self._mask_lock:
+            for skill in skills:
+                if skill not in self._skill_id:
+                    self._skill_id[skill] = len(self._skill_names)
+                    self._skill_names.append(skill)
+                mask |= 1 << self._skill_id[skill]
+        return mask
+    
+    def _skill_names_of(self, mask: int) -> List[str]:
+        """Decode a skill bitmask back into sorted skill names."""
+        # Bit ids follow first-seen order, so sort for output that does not depend on it
+        return sorted(self._skill_names[i] for i in range(mask.bit_length()) if mask >> i & 1)
+    
+    def _get_skill_differences_batch(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, List[str]]]:
+        """Get skill differences for several role pairs from the role cache."""
+        self._batch_role_info([role for pair in pairs for role in pair])
+        return {(role1, role2): self._get_skill_differences(role1, role2) for role1, role2 in pairs}
+    
     def get_skill_info(self, skill: str) -> str:
         """Get detailed information about a skill for the UI."""
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (s:Skill {name: $skill})
-                OPTIONAL MATCH (r:Role)-[:REQUIRES_SKILL]->(s)
-                RETURN s.name as name,
-                       collect(DISTINCT r.name) as required_by_roles
-            """, skill=skill)
-            record = result.single()
-            if not record:
-                return None
-            info = f"Skill: {record['name']}\n"
-            if record['required_by_roles'] and record['required_by_roles'][0] is not None:
-                info += "Required by Roles: " + ", ".join(record['required_by_roles'])
-            return info
+        self._expire_caches()
+        self._batch_skill_info([skill])
+        return self._skill_cache.get(skill)
+
+    def _batch_skill_info(self, names: List[str]) -> None:
+        """Fetch the requiring roles for all uncached skills in one query."""
+        missing = [name for name in dict.fromkeys(names) if name not in self._skill_cache]
+        if not missing:
+            return
+        
+        records = self._read("""
+            UNWIND $skills AS sn
+            MATCH (s:Skill {name: sn})
+            OPTIONAL MATCH (r:Role)-[:REQUIRES_SKILL]->(s)
+            RETURN sn, collect(DISTINCT r.name) as roles
+        """, skills=missing)
+        
+        found = {}
+        for record in records:
+            found[record['sn']] = self._format_skill_info(record['sn'], record['roles'])
+        for name in missing:
+            self._skill_cache[name] = found.get(name)
+    
+    @staticmethod
+    def _format_skill_info(name: str, roles: List[str]) -> str:
+        """Format a skill and the roles that require it."""
+        info = f"Skill: {name}\n"
+        if roles and roles[0] is not None:
+            info += "Required by Roles: " + ", ".join(roles)
+        return info
 
     def get_graph_context(self, query: str) -> str:
         """Get relevant context from the graph database."""
-        with self.driver.session(database=self.database) as session:
-            # Extract roles and skills from the query
-            roles = self._extract_roles(query)
-            skills = self._extract_skills(query)
-            context = []
-            # Get role information
-            if roles:
-                context.append("Role Information:")
-                for role in roles:
-                    role_info = self.get_role_info(role)
-                    if role_info:
-                        context.append(f"Role: {role_info['name']}")
-                        if role_info['levels']:
-                            context.append("Levels: " + ", ".join(role_info['levels']))
-                        if role_info['skills']:
-                            context.append("Skills: " + ", ".join(role_info['skills']))
-            # Get skill information
-            if skills:
-                context.append("\nSkill Information:")
-                for skill in skills:
-                    skill_info = self.get_skill_info(skill)
-                    if skill_info:
-                        context.append(skill_info)
-            # Get transition paths if multiple roles are mentioned
-            if len(roles) >= 2:
-                context.append("\nTransition Path:")
-                transition_info = self.get_transition_path(roles[0], roles[1])
-                if transition_info:
-                    context.append(transition_info)
-            return "\n".join(context) if context else "No specific roles or skills mentioned in the query."
+        self._expire_caches()
+        return self._graph_context_cache(query)
+    
+    def _expire_caches(self) -> None:
+        """Reload cached graph results once they are older than GRAPH_CACHE_TTL."""
+        if time.monotonic() - self._caches_loaded_at < GRAPH_CACHE_TTL:
+            return
+        with self._cache_lock:
+            # Another thread may have reloaded the caches while we waited
+            if time.monotonic() - self._caches_loaded_at >= GRAPH_CACHE_TTL:
+                self.clear_caches()
+    
+    def clear_caches(self) -> None:
+        """Drop cached graph results, e.g. after the graph has changed or the driver reconnected."""
+        self._role_cache.clear()
+        self._skill_cache.clear()
+        self._path_cache.clear()
+        self._role_mask.clear()
+        self._graph_context_cache.cache_clear()
+        self._caches_loaded_at = time.monotonic()
+        self._warmup()
+    
+    def _query_graph_context(self, query: str) -> str:
+        """Build the graph context for a query from Neo4j."""
+        return "\n".join(self._iter_graph_context(query)) or NO_GRAPH_CONTEXT
     
-    def _extract_roles(self, query: str) -> List[str]:
+    def _iter_graph_context(self, query: str) -> Iterator[str]:
+        """Yield the graph context lines for a query."""
+        # Extract roles and skills from the query
+        roles = self._extract_roles(query)
+        skills = self._extract_skills(query)
+        # Fetch all roles and skills in one round-trip each
+        self._batch_role_info(roles)
+        self._batch_skill_info(skills)
+        # Get role information
+        if roles:
+            yield "Role Information:"
+            for role in roles:
+                role_info = self._role_cache.get(role)
+                if role_info:
+                    yield f"Role: {role_info['name']}"
+                    if role_info['levels']:
+                        yield "Levels: " + ", ".join(role_info['levels'])
+                    if role_info['skills']:
+                        yield "Skills: " + ", ".join(role_info['skills'])
+        # Get skill information
+        if skills:
+            yield "\nSkill Information:"
+            for skill in skills:
+                skill_info = self._skill_cache.get(skill)
+                if skill_info:
+                    yield skill_info
+        # Get transition paths if multiple roles are mentioned
+        if len(roles) >= 2:
+            yield "\nTransition Path:"
+            transition_info = self.get_transition_path(roles[0], roles[1])
+            if transition_info:
+                yield transition_info
+    
+    @staticmethod
+    @lru_cache(maxsize=EXTRACTION_CACHE_SIZE)
+    def _extract_roles(query: str) -> Tuple[str, ...]:
         """Extract role names from the query using improved matching."""
-        roles = ["BI Engineer", "Data Engineer", "Data Analyst", "Machine Learning Engineer"]
         query_lower = query.lower()
         
-        # Check for exact matches first
-        exact_matches = [role for role in roles if role.lower() in query_lower]
+        # Check for exact matches first, in order of appearance
+        exact_matches = tuple(dict.fromkeys(role for _, role in _ROLE_AC.iter(query_lower)))
         if exact_matches:
             return exact_matches
         
-        # Check for partial matches
-        partial_matches = []
-        for role in roles:
-            # Split role into words and check if all words are present
-            role_words = role.lower().split()
-            if all(word in query_lower for word in role_words):
-                partial_matches.append(role)
-        
-        return partial_matches
+        # Check for partial matches: all words of the role are present
+        return tuple(
+            role for role, role_words in _ROLE_WORDS
+            if all(word in query_lower for word in role_words)
+        )
     
-    def _extract_skills(self, query: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=EXTRACTION_CACHE_SIZE)
+    def _extract_skills(query: str) -> Tuple[str, ...]:
         """Extract skill names from the query."""
-        skills = [
-            "Python", "SQL", "Power BI", "Tableau", "Data Warehousing",
-            "ETL Processes", "Statistics", "Machine Learning", "Deep Learning",
-            "MLOps", "Cloud Platforms"
-        ]
-        query_lower = query.lower()
-        return [skill for skill in skills if skill.lower() in query_lower]
+        return tuple(dict.fromkeys(skill for _, skill in _SKILL_AC.iter(query.lower())))
     
     def get_skill_gaps(self, current_role: str, target_role: str) -> str:
         """Get skill gaps between current and target roles."""
@@ -379,5 +688,7 @@ Answer: Let me help you with that. """
 
     def __del__(self):
         """Clean up Neo4j connection."""
+        if hasattr(self, '_executor'):
+            self._executor.shutdown(wait=False)
         if hasattr(self, 'driver'):
             self.driver.close() 
\ No newline at end of file
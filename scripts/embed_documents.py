@@ -1,17 +1,27 @@
 import os
+import sys
 import logging
 import shutil
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Set, Tuple
 import numpy as np
 from tqdm import tqdm
-from langchain.text_splitter import RecursiveCharacterTextSplitter, MarkdownHeaderTextSplitter
-from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.text_splitter import MarkdownHeaderTextSplitter
+from semantic_text_splitter import TextSplitter
 from langchain.vectorstores import FAISS
-from langchain.document_loaders import DirectoryLoader, TextLoader
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain.schema import Document
 import datetime
-import json
+import orjson
+import math
+import tempfile
+import uuid
+import faiss
+from langchain.docstore.in_memory import InMemoryDocstore
+from rag.embeddings import get_embeddings
+from rag.pipeline import IVF_NPROBE
 
 # Configure logging
 logging.basicConfig(
@@ -28,29 +38,110 @@ logger = logging.getLogger(__name__)
 ROOT_DIR = Path(__file__).parent.parent
 DATA_DIR = ROOT_DIR / "data"
 VECTOR_STORE_DIR = ROOT_DIR / "rag" / "vector_store"
+BACKUP_DIR = ROOT_DIR / "rag" / "vector_store_backups"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 CHUNK_SIZE = 2000
 CHUNK_OVERLAP = 400
+ENCODE_BATCH_SIZE = 64
+READ_WORKERS = 16
+
+# Below this many documents, process start-up costs more than splitting serially
+PARALLEL_SPLIT_MIN_DOCUMENTS = 8
+
+# IVF-PQ index parameters; smaller corpora use an 8-bit scalar quantizer.
+# The default nprobe comes from rag.pipeline so build and search agree.
+IVFPQ_MIN_VECTORS = 10000
+PQ_SUBQUANTIZERS = 48
+PQ_BITS = 8
 
 # Markdown header patterns to split on
-HEADERS_TO_SPLIT_ON = [
+HEADERS_TO_SPLIT_ON = (
     ("#", "Header 1"),
     ("##", "Header 2"),
     ("###", "Header 3"),
-]
+)
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a temporary sibling so hardlinked backups keep the old contents."""
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+def _source_key(path) -> str:
+    """Key a source file by its path relative to the data directory."""
+    path = Path(path)
+    if path.is_absolute():
+        try:
+            return path.relative_to(DATA_DIR).as_posix()
+        except ValueError:
+            # Legacy metadata recorded absolute paths, possibly from another checkout
+            parts = path.parts
+            if "data" in parts:
+                start = len(parts) - parts[::-1].index("data")
+                return Path(*parts[start:]).as_posix()
+    return path.as_posix()
+
+def _read_markdown(path: Path) -> Document:
+    """Read a markdown file into a Document."""
+    return Document(
+        page_content=path.read_text(encoding="utf-8", errors="replace"),
+        metadata={"source": _source_key(path)}
+    )
+
+@lru_cache(maxsize=None)
+def _get_splitters(
+    headers_to_split_on: Tuple[Tuple[str, str], ...], chunk_size: int, chunk_overlap: int
+) -> Tuple[MarkdownHeaderTextSplitter, TextSplitter]:
+    """Build the splitters once per worker process."""
+    markdown_splitter = MarkdownHeaderTextSplitter(
+        headers_to_split_on=list(headers_to_split_on)
+    )
+    # The Rust splitter prefers paragraph, line, sentence and word boundaries in turn
+    text_splitter = TextSplitter(chunk_size, overlap=chunk_overlap)
+    return markdown_splitter, text_splitter
+
+def _split_one(args: Tuple[str, Dict, Tuple[Tuple[str, str], ...], int, int]) -> List[Document]:
+    """Split a single document by markdown headers, then into sized chunks."""
+    page_content, metadata, headers_to_split_on, chunk_size, chunk_overlap = args
+    try:
+        markdown_splitter, text_splitter = _get_splitters(headers_to_split_on, chunk_size, chunk_overlap)
+        
+        chunks = []
+        # First split by headers
+        for split in markdown_splitter.split_text(page_content):
+            # Then split each header section into smaller chunks if needed
+            for chunk in text_splitter.chunks(split.page_content):
+                # Create a new Document with combined metadata
+                chunks.append(Document(
+                    page_content=chunk,
+                    metadata={
+                        **metadata,  # Original document metadata
+                        **split.metadata,  # Header metadata
+                        "chunk_size": len(chunk)
+                    }
+                ))
+        return chunks
+    except Exception as e:
+        logger.warning(f"Failed to process document {metadata.get('source', 'unknown')}: {str(e)}")
+        return []
 
 class DocumentEmbedder:
-    def __init__(self):
+    def __init__(self, fp16: bool = True, bf16: bool = False):
+        self.fp16 = fp16
+        self.bf16 = bf16
         self.embeddings = None
+        self.st_model = None
         self.vector_store = None
         self.metadata_file = VECTOR_STORE_DIR / "metadata.json"
-        self.backup_dir = VECTOR_STORE_DIR / "backups"
+        self.backup_dir = BACKUP_DIR
         
     def initialize_embeddings(self):
         """Initialize the embedding model."""
         try:
             logger.info("Initializing embedding model...")
-            self.embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+            self.embeddings = get_embeddings(EMBEDDING_MODEL, half_precision=self.fp16, cpu_bf16=self.bf16)
+            # Reuse the wrapper's SentenceTransformer for batched document encoding
+            self.st_model = self.embeddings.client
             logger.info("Embedding model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {str(e)}")
@@ -71,13 +162,9 @@ class DocumentEmbedder:
             temp_dir = self.backup_dir / f"temp_{timestamp}"
             temp_dir.mkdir(parents=True, exist_ok=True)
             
-            # Copy everything except the backups directory
+            # Snapshot the whole vector store
             for item in VECTOR_STORE_DIR.iterdir():
-                if item.name != "backups":
-                    if item.is_file():
-                        shutil.copy2(item, temp_dir)
-                    elif item.is_dir():
-                        shutil.copytree(item, temp_dir / item.name)
+                self._link_tree(item, temp_dir / item.name)
             
             # Move the temporary directory to the final backup location
             shutil.move(str(temp_dir), str(backup_path))
@@ -88,6 +175,24 @@ class DocumentEmbedder:
                 shutil.rmtree(temp_dir)
             raise
 
+    @staticmethod
+    def _link_tree(src: Path, dst: Path) -> None:
+        """Hardlink a file or directory tree, copying where links are not possible."""
+        if src.is_dir():
+            dst.mkdir(parents=True, exist_ok=True)
+            for child in src.iterdir():
+                DocumentEmbedder._link_tree(child, dst / child.name)
+            return
+        
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Every writer of the vector store replaces files via os.replace rather
+            # than truncating them, so sharing inodes with the backup is safe
+            os.link(src, dst)
+        except OSError:
+            # e.g. the backup lives on another filesystem
+            shutil.copy2(src, dst)
+
     def _clean_vector_store(self) -> None:
         """Clean the vector store directory."""
         try:
@@ -106,27 +211,35 @@ class DocumentEmbedder:
             return set()
             
         try:
-            with open(self.metadata_file, 'r') as f:
-                metadata = json.load(f)
-                return set(metadata.get('document_sources', []))
+            with open(self.metadata_file, 'rb') as f:
+                metadata = orjson.loads(f.read())
+                return {_source_key(source) for source in metadata.get('document_sources', [])}
         except Exception as e:
             logger.error(f"Failed to read existing sources: {str(e)}")
             return set()
 
     def _get_modified_files(self, existing_sources: Set[str]) -> List[Path]:
-        """Get list of modified files since last processing."""
+        """Get list of new and modified files since last processing."""
+        if not self.metadata_file.exists():
+            return []
+        metadata_modified = self.metadata_file.stat().st_mtime
+        
+        on_disk = {_source_key(path): path for path in DATA_DIR.rglob("*.md")}
         modified_files = []
         for source in existing_sources:
-            file_path = Path(source)
-            if file_path.exists():
-                # Check if file was modified after last processing
-                if self.metadata_file.exists():
-                    last_modified = datetime.datetime.fromtimestamp(file_path.stat().st_mtime)
-                    metadata_modified = datetime.datetime.fromtimestamp(self.metadata_file.stat().st_mtime)
-                    if last_modified > metadata_modified:
-                        modified_files.append(file_path)
+            file_path = on_disk.get(source)
+            # Check if file was modified after last processing
+            if file_path is not None and file_path.stat().st_mtime > metadata_modified:
+                modified_files.append(file_path)
+        
+        # Files on disk that were never processed
+        modified_files.extend(on_disk[source] for source in sorted(on_disk.keys() - existing_sources))
         return modified_files
 
+    def _get_deleted_sources(self, existing_sources: Set[str]) -> Set[str]:
+        """Get sources that were processed before but no longer exist on disk."""
+        return {source for source in existing_sources if not (DATA_DIR / source).exists()}
+
     def load_documents(self, incremental: bool = False) -> List[Document]:
         """Load documents from the data directory."""
         try:
@@ -140,15 +253,16 @@ class DocumentEmbedder:
                 existing_sources = self._get_existing_sources()
                 modified_files = self._get_modified_files(existing_sources)
                 
-                # Load only new and modified files
-                new_documents = []
-                for file_path in modified_files:
+                def load_file(file_path: Path) -> Optional[Document]:
                     try:
-                        loader = TextLoader(str(file_path))
-                        new_documents.extend(loader.load())
+                        return _read_markdown(file_path)
                     except Exception as e:
                         logger.warning(f"Failed to load {file_path}: {str(e)}")
-                        continue
+                        return None
+                
+                # Load only new and modified files
+                with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+                    new_documents = [doc for doc in executor.map(load_file, modified_files) if doc is not None]
                 
                 if not new_documents:
                     logger.info("No new or modified documents found")
@@ -157,17 +271,14 @@ class DocumentEmbedder:
                 logger.info(f"Loaded {len(new_documents)} new/modified documents")
                 return new_documents
             else:
-                # Load all documents
-                if not any(DATA_DIR.glob("**/*.md")):
+                # Load all documents from a single walk of the data directory
+                paths = list(DATA_DIR.rglob("*.md"))
+                if not paths:
                     raise FileNotFoundError(f"No markdown files found in {DATA_DIR}")
                 
-                loader = DirectoryLoader(
-                    DATA_DIR,
-                    glob="**/*.md",
-                    loader_cls=TextLoader,
-                    recursive=True
-                )
-                documents = loader.load()
+                # File reads are I/O-bound, so threads overlap them well
+                with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+                    documents = list(executor.map(_read_markdown, paths))
                 
                 if not documents:
                     raise ValueError(f"No documents loaded from {DATA_DIR}")
@@ -184,42 +295,30 @@ class DocumentEmbedder:
         try:
             logger.info("Starting document splitting process")
             
-            # First split by markdown headers
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=HEADERS_TO_SPLIT_ON
-            )
-            
-            # Then split into smaller chunks if needed
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=CHUNK_SIZE,
-                chunk_overlap=CHUNK_OVERLAP,
-                length_function=len,
-                separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-            )
-            
+            args = [
+                (doc.page_content, doc.metadata, HEADERS_TO_SPLIT_ON, CHUNK_SIZE, CHUNK_OVERLAP)
+                for doc in documents
+            ]
             all_chunks = []
-            for doc in tqdm(documents, desc="Splitting documents"):
-                try:
-                    # First split by headers
-                    header_splits = markdown_splitter.split_text(doc.page_content)
-                    
-                    # Then split each header section into smaller chunks if needed
-                    for split in header_splits:
-                        chunks = text_splitter.split_text(split.page_content)
-                        for chunk in chunks:
-                            # Create a new Document with combined metadata
-                            new_doc = Document(
-                                page_content=chunk,
-                                metadata={
-                                    **doc.metadata,  # Original document metadata
-                                    **split.metadata,  # Header metadata
-                                    "chunk_size": len(chunk)
-                                }
-                            )
-                            all_chunks.append(new_doc)
-                except Exception as e:
-                    logger.warning(f"Failed to process document {doc.metadata.get('source', 'unknown')}: {str(e)}")
-                    continue
+            if len(args) < PARALLEL_SPLIT_MIN_DOCUMENTS:
+                for arg in args:
+                    all_chunks.extend(_split_one(arg))
+            else:
+                # Documents are independent, so split them across CPU cores, never
+                # starting more processes than there are documents
+                workers = min(os.cpu_count() or 1, len(args))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # Throttle progress updates and skip them entirely when not on a terminal
+                    progress = tqdm(
+                        executor.map(_split_one, args, chunksize=4),
+                        total=len(args),
+                        desc="Splitting documents",
+                        mininterval=0.5,
+                        miniters=max(1, len(args) // 100),
+                        disable=not sys.stderr.isatty()
+                    )
+                    for chunks in progress:
+                        all_chunks.extend(chunks)
             
             logger.info(f"Successfully created {len(all_chunks)} chunks from {len(documents)} documents")
             return all_chunks
@@ -231,32 +330,123 @@ class DocumentEmbedder:
         """Create and save FAISS vector store."""
         try:
             logger.info("Creating FAISS vector store...")
-            self.vector_store = FAISS.from_documents(documents, self.embeddings)
+            self.vector_store = self._build_vector_store(documents)
             
             # Create vector store directory if it doesn't exist
             VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
             
             logger.info("Saving vector store...")
-            self.vector_store.save_local(str(VECTOR_STORE_DIR))
+            self._save_vector_store()
             
             # Save metadata about the vector store
-            self._save_metadata(documents)
+            self._save_metadata()
             
             logger.info(f"Vector store saved to {VECTOR_STORE_DIR}")
         except Exception as e:
             logger.error(f"Failed to create vector store: {str(e)}")
             raise
 
-    def _save_metadata(self, documents: List[Document]) -> None:
+    def _save_vector_store(self) -> None:
+        """Save the vector store by replacing its files rather than rewriting them."""
+        VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        # save_local truncates existing files, which would also change hardlinked backups
+        with tempfile.TemporaryDirectory(dir=VECTOR_STORE_DIR) as temp_dir:
+            self.vector_store.save_local(temp_dir)
+            for item in Path(temp_dir).iterdir():
+                os.replace(item, VECTOR_STORE_DIR / item.name)
+
+    def _encode_documents(self, documents: List[Document]) -> np.ndarray:
+        """Encode document chunks in length-sorted batches to minimize padding."""
+        texts = [doc.page_content for doc in documents]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_embeddings = self.st_model.encode(
+            [texts[i] for i in order],
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=True
+        )
+        
+        # Restore the original document order; FAISS needs float32 vectors
+        sorted_embeddings = sorted_embeddings.astype(np.float32)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+
+    def _build_vector_store(self, documents: List[Document]) -> FAISS:
+        """Build a FAISS vector store from precomputed document embeddings."""
+        embeddings = self._encode_documents(documents)
+        dimension = embeddings.shape[1]
+        
+        # Embeddings are L2-normalized, so inner product ranks like cosine similarity
+        # and is cheaper to compute than L2 distance
+        if len(documents) >= IVFPQ_MIN_VECTORS:
+            nlist = max(32, int(4 * math.sqrt(len(documents))))
+            logger.info(f"Training IVF{nlist},PQ{PQ_SUBQUANTIZERS} index on {len(documents)} vectors...")
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(
+                quantizer, dimension, nlist, PQ_SUBQUANTIZERS, PQ_BITS, faiss.METRIC_INNER_PRODUCT
+            )
+            index.nprobe = IVF_NPROBE
+        else:
+            # 8-bit scalar quantization stores one byte per dimension
+            logger.info(f"Training SQ8 index on {len(documents)} vectors...")
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        index.add(embeddings)
+        
+        ids = [str(uuid.uuid4()) for _ in documents]
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            # No normalize_L2: the encoder already returns unit vectors
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+
+    def _append_chunks(self, chunks: List[Document], deleted_sources: Set[str] = frozenset()) -> None:
+        """Replace the chunks of re-processed sources in the loaded vector store."""
+        # Drop the old chunks of modified and deleted files so they are not indexed twice
+        sources = {chunk.metadata.get("source") for chunk in chunks} | set(deleted_sources)
+        stale_ids = [
+            doc_id for doc_id, doc in self.vector_store.docstore._dict.items()
+            if _source_key(doc.metadata.get("source", "")) in sources
+        ]
+        if stale_ids:
+            self.vector_store.delete(stale_ids)
+        
+        if chunks:
+            embeddings = self._encode_documents(chunks)
+            self.vector_store.add_embeddings(
+                list(zip([chunk.page_content for chunk in chunks], embeddings)),
+                metadatas=[chunk.metadata for chunk in chunks]
+            )
+        logger.info(f"Appended {len(chunks)} chunks, removed {len(stale_ids)} stale chunks")
+
+    def _save_metadata(self) -> None:
         """Save metadata about the vector store."""
-        # Calculate statistics about chunks
-        chunk_sizes = [len(doc.page_content) for doc in documents]
-        avg_chunk_size = sum(chunk_sizes) / len(chunk_sizes) if chunk_sizes else 0
+        # Describe the whole store, so incremental runs report unchanged files too
+        chunks = list(self.vector_store.docstore._dict.values())
+        
+        # Calculate chunk statistics and sources in a single pass
+        total_size = 0
+        min_size = None
+        max_size = 0
+        sources = set()
+        for chunk in chunks:
+            size = len(chunk.page_content)
+            total_size += size
+            if min_size is None or size < min_size:
+                min_size = size
+            if size > max_size:
+                max_size = size
+            sources.add(_source_key(chunk.metadata.get("source", "unknown")))
+        avg_chunk_size = total_size / len(chunks) if chunks else 0
         
         # Group documents by type (role, skill, learning path)
         doc_types = {}
-        for doc in documents:
-            source = doc.metadata.get("source", "unknown")
+        for source in sources:
             if "roles" in source:
                 doc_types["roles"] = doc_types.get("roles", 0) + 1
             elif "skills" in source:
@@ -265,47 +455,54 @@ class DocumentEmbedder:
                 doc_types["learning_paths"] = doc_types.get("learning_paths", 0) + 1
         
         metadata = {
-            "total_documents": len(documents),
+            "total_documents": len(sources),
             "document_types": doc_types,
             "chunk_size": CHUNK_SIZE,
             "chunk_overlap": CHUNK_OVERLAP,
             "chunk_statistics": {
                 "average_size": round(avg_chunk_size, 2),
-                "min_size": min(chunk_sizes) if chunk_sizes else 0,
-                "max_size": max(chunk_sizes) if chunk_sizes else 0,
-                "total_chunks": len(chunk_sizes)
+                "min_size": min_size or 0,
+                "max_size": max_size,
+                "total_chunks": len(chunks)
             },
             "embedding_model": EMBEDDING_MODEL,
-            "document_sources": list(set(doc.metadata.get("source", "unknown") for doc in documents)),
+            "document_sources": list(sources),
             "creation_timestamp": datetime.datetime.now().isoformat(),
             "vector_store_path": str(VECTOR_STORE_DIR),
             "processing_parameters": {
                 "headers_to_split_on": HEADERS_TO_SPLIT_ON,
-                "separators": ["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+                "text_splitter": "semantic-text-splitter"
             }
         }
         
-        with open(VECTOR_STORE_DIR / "metadata.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        _write_atomic(self.metadata_file, orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
             
-        # Also save a human-readable summary
-        with open(VECTOR_STORE_DIR / "metadata_summary.txt", "w") as f:
-            f.write(f"Vector Store Summary\n")
-            f.write(f"===================\n\n")
-            f.write(f"Created: {metadata['creation_timestamp']}\n")
-            f.write(f"Total Documents: {metadata['total_documents']}\n")
-            f.write(f"\nDocument Types:\n")
-            for doc_type, count in metadata['document_types'].items():
-                f.write(f"- {doc_type}: {count}\n")
-            f.write(f"\nChunk Statistics:\n")
-            f.write(f"- Average Size: {metadata['chunk_statistics']['average_size']} characters\n")
-            f.write(f"- Min Size: {metadata['chunk_statistics']['min_size']} characters\n")
-            f.write(f"- Max Size: {metadata['chunk_statistics']['max_size']} characters\n")
-            f.write(f"- Total Chunks: {metadata['chunk_statistics']['total_chunks']}\n")
-            f.write(f"\nEmbedding Model: {metadata['embedding_model']}\n")
-            f.write(f"\nDocument Sources:\n")
-            for source in sorted(metadata['document_sources']):
-                f.write(f"- {source}\n")
+        # Also save a human-readable summary, written in one go
+        stats = metadata['chunk_statistics']
+        parts = [
+            "Vector Store Summary",
+            "===================",
+            "",
+            f"Created: {metadata['creation_timestamp']}",
+            f"Total Documents: {metadata['total_documents']}",
+            "",
+            "Document Types:",
+        ]
+        parts.extend(f"- {doc_type}: {count}" for doc_type, count in metadata['document_types'].items())
+        parts.extend([
+            "",
+            "Chunk Statistics:",
+            f"- Average Size: {stats['average_size']} characters",
+            f"- Min Size: {stats['min_size']} characters",
+            f"- Max Size: {stats['max_size']} characters",
+            f"- Total Chunks: {stats['total_chunks']}",
+            "",
+            f"Embedding Model: {metadata['embedding_model']}",
+            "",
+            "Document Sources:",
+        ])
+        parts.extend(f"- {source}" for source in sorted(metadata['document_sources']))
+        _write_atomic(VECTOR_STORE_DIR / "metadata_summary.txt", ("\n".join(parts) + "\n").encode())
 
     def process_documents(self, incremental: bool = False):
         """Process documents and create/update vector store."""
@@ -320,29 +517,42 @@ class DocumentEmbedder:
             # Load documents
             documents = self.load_documents(incremental)
             
-            if not documents:
+            deleted_sources = set()
+            if incremental and self.metadata_file.exists():
+                deleted_sources = self._get_deleted_sources(self._get_existing_sources())
+            
+            if not documents and not deleted_sources:
                 logger.info("No documents to process")
                 return
             
             # Split documents
-            chunks = self.split_documents(documents)
+            chunks = self.split_documents(documents) if documents else []
             
-            if not chunks:
+            if documents and not chunks:
                 logger.warning("No chunks created from documents")
                 return
             
+            if incremental and self.metadata_file.exists():
+                self.vector_store = FAISS.load_local(
+                    str(VECTOR_STORE_DIR),
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+            
             if incremental and self.vector_store is not None:
-                # Add new chunks to existing vector store
-                self.vector_store.add_documents(chunks)
+                # Append only the new chunks and drop those of deleted files
+                if deleted_sources:
+                    logger.info(f"Removing {len(deleted_sources)} deleted documents")
+                self._append_chunks(chunks, deleted_sources)
             else:
                 # Create new vector store
-                self.vector_store = FAISS.from_documents(chunks, self.embeddings)
+                self.vector_store = self._build_vector_store(chunks)
             
             # Save vector store
-            self.vector_store.save_local(str(VECTOR_STORE_DIR))
+            self._save_vector_store()
             
             # Update metadata
-            self._save_metadata(documents)
+            self._save_metadata()
             
             logger.info("Document processing completed successfully")
         except Exception as e:
@@ -356,10 +566,14 @@ def main():
     parser = argparse.ArgumentParser(description='Process documents for vector store')
     parser.add_argument('--incremental', action='store_true',
                       help='Perform incremental update instead of full reprocessing')
+    parser.add_argument('--no-fp16', action='store_true',
+                      help='Encode in full precision even if half precision is available')
+    parser.add_argument('--bf16', action='store_true',
+                      help='Encode in bf16 when running on CPU (needs sentence-transformers 3)')
     args = parser.parse_args()
     
     try:
-        embedder = DocumentEmbedder()
+        embedder = DocumentEmbedder(fp16=not args.no_fp16, bf16=args.bf16)
         embedder.process_documents(incremental=args.incremental)
     except Exception as e:
         logger.error(f"Script execution failed: {str(e)}")
@@ -0,0 +1,42 @@
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from optimum.onnxruntime import ORTModelForFeatureExtraction
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from transformers import AutoTokenizer
+from rag.embeddings import EMBEDDING_MODEL
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+ROOT_DIR = Path(__file__).parent.parent
+ONNX_MODEL_DIR = ROOT_DIR / "rag" / "models" / "minilm-int8"
+
+def export_model():
+    """Export the embedding model to ONNX and quantize its weights to int8."""
+    try:
+        ONNX_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            logger.info(f"Exporting {EMBEDDING_MODEL} to ONNX...")
+            model = ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL, export=True)
+            model.save_pretrained(tmp_dir)
+            
+            logger.info("Quantizing model weights to int8...")
+            quantize_dynamic(
+                str(Path(tmp_dir) / "model.onnx"),
+                str(ONNX_MODEL_DIR / "model.onnx"),
+                weight_type=QuantType.QInt8
+            )
+            shutil.copy2(Path(tmp_dir) / "config.json", ONNX_MODEL_DIR / "config.json")
+        
+        AutoTokenizer.from_pretrained(EMBEDDING_MODEL).save_pretrained(str(ONNX_MODEL_DIR))
+        logger.info(f"Quantized model saved to {ONNX_MODEL_DIR}")
+    except Exception as e:
+        logger.error(f"Failed to export model: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    export_model()
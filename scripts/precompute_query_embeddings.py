@@ -0,0 +1,30 @@
+import logging
+import numpy as np
+from rag.embeddings import EMBEDDING_MODEL, get_embeddings
+from sample_queries import QUERY_EMBEDDINGS_FILE, TEST_QUESTIONS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def precompute_query_embeddings():
+    """Embed the fixed test questions once and save them next to the vector store."""
+    try:
+        logger.info(f"Embedding {len(TEST_QUESTIONS)} test questions with {EMBEDDING_MODEL}...")
+        embeddings = get_embeddings(EMBEDDING_MODEL)
+        vectors = np.asarray(embeddings.embed_documents(TEST_QUESTIONS), dtype=np.float32)
+        
+        QUERY_EMBEDDINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            QUERY_EMBEDDINGS_FILE,
+            model=np.array(EMBEDDING_MODEL),
+            queries=np.array(TEST_QUESTIONS),
+            embeddings=vectors
+        )
+        logger.info(f"Query embeddings saved to {QUERY_EMBEDDINGS_FILE}")
+    except Exception as e:
+        logger.error(f"Failed to precompute query embeddings: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    precompute_query_embeddings()
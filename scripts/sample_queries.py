@@ -0,0 +1,17 @@
+"""
+Fixed questions for exercising the RAG pipeline, shared by the test and precompute scripts.
+"""
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Written by scripts/precompute_query_embeddings.py
+QUERY_EMBEDDINGS_FILE = ROOT_DIR / "rag" / "test_query_embeddings.npz"
+
+TEST_QUESTIONS = [
+    "What skills do I need to become a Data Engineer?",
+    "How can I transition from BI Engineer to Data Engineer?",
+    "What are the key differences between Data Analyst and Data Engineer roles?",
+    "What skills should I focus on to move from Data Analyst to Machine Learning Engineer?",
+    "Tell me about the Python skills needed for data roles"
+]
@@ -1,8 +1,9 @@
 import os
 from pathlib import Path
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 import logging
+import numpy as np
+from rag.embeddings import get_embeddings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,7 +17,7 @@ EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 def load_vector_store():
     """Load the FAISS vector store."""
     try:
-        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        embeddings = get_embeddings(EMBEDDING_MODEL)
         vector_store = FAISS.load_local(
             str(VECTOR_STORE_DIR), 
             embeddings,
@@ -38,9 +39,16 @@ def test_queries(vector_store):
         "What are the main differences between Data Analyst and ML Engineer?"
     ]
     
-    for query in test_queries:
+    # Embed all queries in one forward pass and search them as a single batch
+    query_vectors = np.asarray(vector_store.embeddings.embed_documents(test_queries), dtype=np.float32)
+    _, indices = vector_store.index.search(query_vectors, 2)
+    
+    for query, row in zip(test_queries, indices):
         logger.info(f"\nQuery: {query}")
-        docs = vector_store.similarity_search(query, k=2)
+        docs = [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            for i in row if i != -1
+        ]
         for i, doc in enumerate(docs, 1):
             logger.info(f"\nResult {i}:")
             logger.info(f"Source: {doc.metadata.get('source', 'unknown')}")
@@ -7,6 +7,36 @@ from neo4j import GraphDatabase
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _smoke(tx):
+    """Run all smoke-test queries in a single read transaction."""
+    return {
+        # Test 1: Basic connection
+        "ok": tx.run("RETURN 1 as test").single()["test"],
+        # Test 2: List all roles
+        "roles": [record["role"] for record in tx.run("MATCH (r:Role) RETURN r.name as role")],
+        # Test 3: List all skills
+        "skills": [record["skill"] for record in tx.run("MATCH (s:Skill) RETURN s.name as skill")],
+        # Test 4: Get role-skill relationships with more detailed query
+        "rels": [
+            (record["role"], record["relationships"])
+            for record in tx.run("""
+                MATCH (r:Role)
+                OPTIONAL MATCH (r)-[rel]->(s:Skill)
+                RETURN r.name as role, 
+                       collect(DISTINCT {skill: s.name, type: type(rel)}) as relationships
+                ORDER BY r.name
+            """)
+        ],
+        # Test 5: Check for any relationships in the graph
+        "rel_types": [
+            (record["relationship_type"], record["count"])
+            for record in tx.run("""
+                MATCH ()-[r]->()
+                RETURN DISTINCT type(r) as relationship_type, count(*) as count
+            """)
+        ]
+    }
+
 def test_neo4j_connection():
     """Test Neo4j connection and basic queries."""
     # Load environment variables
@@ -21,59 +51,38 @@ def test_neo4j_connection():
     if not password:
         raise ValueError("NEO4J_PASSWORD environment variable is required")
     
+    driver = None
     try:
         # Create driver instance
         logger.info(f"Connecting to Neo4j at {uri} (database: {database})...")
-        driver = GraphDatabase.driver(uri, auth=(user, password))
+        driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=20)
         
-        # Test connection
+        # Run all tests in one transaction
         with driver.session(database=database) as session:
-            # Test 1: Basic connection
-            result = session.run("RETURN 1 as test")
-            test_value = result.single()["test"]
-            logger.info(f"Basic connection test: {'✓' if test_value == 1 else '✗'}")
-            
-            # Test 2: List all roles
-            result = session.run("MATCH (r:Role) RETURN r.name as role")
-            roles = [record["role"] for record in result]
-            logger.info(f"\nFound {len(roles)} roles:")
-            for role in roles:
-                logger.info(f"- {role}")
-            
-            # Test 3: List all skills
-            result = session.run("MATCH (s:Skill) RETURN s.name as skill")
-            skills = [record["skill"] for record in result]
-            logger.info(f"\nFound {len(skills)} skills:")
-            for skill in skills:
-                logger.info(f"- {skill}")
-            
-            # Test 4: Get role-skill relationships with more detailed query
-            result = session.run("""
-                MATCH (r:Role)
-                OPTIONAL MATCH (r)-[rel]->(s:Skill)
-                RETURN r.name as role, 
-                       collect(DISTINCT {skill: s.name, type: type(rel)}) as relationships
-                ORDER BY r.name
-            """)
-            logger.info("\nRole-Skill Relationships:")
-            for record in result:
-                role = record["role"]
-                relationships = record["relationships"]
-                if relationships and relationships[0]["skill"] is not None:
-                    logger.info(f"\n{role}:")
-                    for rel in relationships:
-                        logger.info(f"  - {rel['type']} -> {rel['skill']}")
-                else:
-                    logger.info(f"\n{role}: No relationships found")
-            
-            # Test 5: Check for any relationships in the graph
-            result = session.run("""
-                MATCH ()-[r]->()
-                RETURN DISTINCT type(r) as relationship_type, count(*) as count
-            """)
-            logger.info("\nRelationship Types in Graph:")
-            for record in result:
-                logger.info(f"- {record['relationship_type']}: {record['count']} relationships")
+            results = session.execute_read(_smoke)
+        
+        logger.info(f"Basic connection test: {'✓' if results['ok'] == 1 else '✗'}")
+        
+        logger.info(f"\nFound {len(results['roles'])} roles:")
+        for role in results['roles']:
+            logger.info(f"- {role}")
+        
+        logger.info(f"\nFound {len(results['skills'])} skills:")
+        for skill in results['skills']:
+            logger.info(f"- {skill}")
+        
+        logger.info("\nRole-Skill Relationships:")
+        for role, relationships in results['rels']:
+            if relationships and relationships[0]["skill"] is not None:
+                logger.info(f"\n{role}:")
+                for rel in relationships:
+                    logger.info(f"  - {rel['type']} -> {rel['skill']}")
+            else:
+                logger.info(f"\n{role}: No relationships found")
+        
+        logger.info("\nRelationship Types in Graph:")
+        for relationship_type, count in results['rel_types']:
+            logger.info(f"- {relationship_type}: {count} relationships")
         
         logger.info("\nAll Neo4j tests completed!")
         return True
@@ -82,8 +91,8 @@ def test_neo4j_connection():
         logger.error(f"Neo4j test failed: {str(e)}")
         return False
     finally:
-        if 'driver' in locals():
+        if driver is not None:
             driver.close()
 
 if __name__ == "__main__":
-    test_neo4j_connection() 
\ No newline at end of file
+    test_neo4j_connection()
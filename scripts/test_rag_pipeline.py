@@ -1,18 +1,125 @@
 import os
+import re
+import time
+import pickle
+import hashlib
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+
+# OpenMP reads these when the runtime loads, so they must be set before importing faiss;
+# idle threads yield instead of spinning and competing with the BLAS pool
+os.environ.setdefault("OMP_WAIT_POLICY", "PASSIVE")
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count()))
+
+import faiss
+import numpy as np
 from dotenv import load_dotenv
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_community.llms import HuggingFaceHub
 from neo4j import GraphDatabase
+from rag.embeddings import EMBEDDING_MODEL, get_embeddings
+from rag.pipeline import IVF_NPROBE
+from sample_queries import QUERY_EMBEDDINGS_FILE, TEST_QUESTIONS
+try:
+    import ahocorasick
+except ImportError:  # fall back to a compiled regex alternation
+    ahocorasick = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Constants
+ROOT_DIR = Path(__file__).parent.parent
+VECTOR_STORE_DIR = ROOT_DIR / "rag" / "vector_store"
+# Formatted role and skill info, one file per Neo4j URI and database; rebuilt when
+# older than the TTL or than the scripts that define the graph
+GRAPH_CACHE_DIR = ROOT_DIR / "rag"
+GRAPH_CYPHER_DIR = ROOT_DIR / "graph" / "cypher"
+
+# Characters of each retrieved document shown in an answer
+RESOURCE_PREVIEW_CHARS = 200
+
+# Number of distinct queries whose embeddings and search results are kept
+QUERY_CACHE_SIZE = 512
+
+# Vocabularies matched against queries. This is a simple implementation;
+# in a real system, you might want to use NLP
+ROLES = ["BI Engineer", "Data Engineer", "Data Analyst", "Machine Learning Engineer"]
+SKILLS = [
+    "Python", "SQL", "Power BI", "Tableau", "Data Warehousing",
+    "ETL Processes", "Statistics", "Machine Learning", "Deep Learning",
+    "MLOps", "Cloud Platforms"
+]
+
+def _build_matcher(terms: List[str]) -> Callable[[str], List[str]]:
+    """Compile terms into a single-pass matcher over lowercased text.
+    
+    The matcher returns the original terms found, in order of appearance.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for term in terms:
+            automaton.add_word(term.lower(), term)
+        automaton.make_automaton()
+        return lambda text: list(dict.fromkeys(term for _, term in automaton.iter(text)))
+    
+    by_lower = {term.lower(): term for term in terms}
+    # Longest terms first so the alternation prefers the most specific match
+    pattern = re.compile("|".join(map(re.escape, sorted(by_lower, key=len, reverse=True))))
+    return lambda text: list(dict.fromkeys(by_lower[m.group(0)] for m in pattern.finditer(text)))
+
+ROLES_CYPHER = """
+    UNWIND $roles AS rn
+    MATCH (r:Role {name: rn})
+    OPTIONAL MATCH (r)-[rel]->(s:Skill)
+    OPTIONAL MATCH (r)-[:REQUIRES_LEVEL]->(l)
+    RETURN rn,
+           r.name as role,
+           collect(DISTINCT {skill: s.name, type: type(rel)}) as skills,
+           collect(DISTINCT l.name) as levels
+"""
+
+SKILLS_CYPHER = """
+    UNWIND $skills AS sn
+    MATCH (s:Skill {name: sn})
+    OPTIONAL MATCH (r:Role)-[rel]->(s)
+    RETURN sn,
+           s.name as skill,
+           collect(DISTINCT {role: r.name, type: type(rel)}) as roles
+"""
+
+# The path and the skills of every role on it, in one round-trip
+PATH_CYPHER = """
+    MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
+    WITH nodes(path) as ns, relationships(path) as rs
+    RETURN [node in ns | node.name] as path,
+           [rel in rs | type(rel)] as relationships,
+           [node in ns | [(node)-[:REQUIRES_SKILL]->(s:Skill) | s.name]] as skills
+"""
+
+def _graph_context_tx(
+    tx, roles: List[str], skills: List[str], pair: Optional[Tuple[str, str]]
+) -> Tuple[List[Dict], List[Dict], Optional[Dict]]:
+    """Fetch role, skill and transition-path data in a single read transaction."""
+    roles_data = tx.run(ROLES_CYPHER, roles=roles).data() if roles else []
+    skills_data = tx.run(SKILLS_CYPHER, skills=skills).data() if skills else []
+    path_data = None
+    if pair:
+        path_records = tx.run(PATH_CYPHER, from_role=pair[0], to_role=pair[1]).data()
+        path_data = path_records[0] if path_records else None
+    return roles_data, skills_data, path_data
+
 class CareerRAG:
+    # Vector stores are loaded once per process and shared by all instances
+    _vector_stores: Dict[str, FAISS] = {}
+    _gpu_resources = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         # Load environment variables
         load_dotenv()
@@ -27,135 +134,290 @@ class CareerRAG:
             raise ValueError("NEO4J_PASSWORD environment variable is required")
         
         # Initialize vector store
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        self.vector_store = FAISS.load_local(
-            str(Path("rag/vector_store")),
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
+        faiss.omp_set_num_threads(int(os.getenv("FAISS_NUM_THREADS", str(os.cpu_count()))))
+        with CareerRAG._shared_lock:
+            # Shared loader: on GPU in fp16 when CUDA is available, loaded once per process
+            self.embeddings = get_embeddings(EMBEDDING_MODEL)
+            self.vector_store = self._get_vector_store(self.embeddings)
         
         # Initialize Neo4j driver
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        self.driver = GraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=int(os.getenv("NEO4J_POOL_SIZE", "64")),
+            connection_acquisition_timeout=30,
+            max_connection_lifetime=3600,
+            keep_alive=True
+        )
+        # One reusable session per thread; sessions are not thread safe
+        self._tls = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self._ensure_indexes()
         
         # Cache for role and skill information
         self._role_cache = {}
         self._skill_cache = {}
+        graph_key = hashlib.sha1(f"{self.uri}|{self.database}".encode()).hexdigest()[:12]
+        self._graph_cache_file = GRAPH_CACHE_DIR / f"graph_cache_{graph_key}.pkl"
+        self._warm_graph_cache()
+        
+        # Cache for transition paths, keyed by role pair, which recur across questions
+        self._path_cache: Dict[Tuple[str, str], str] = {}
+        
+        # Matchers for extracting roles and skills in one pass over the query
+        self._role_matcher = _build_matcher(ROLES)
+        self._skill_matcher = _build_matcher(SKILLS)
+        # Lowercased words of each role for the partial match fallback
+        self._roles_lc = [(role, tuple(role.lower().split())) for role in ROLES]
+        
+        # Embeddings of known questions, computed ahead of time
+        self._precomputed_embs = self._load_precomputed_embeddings()
+        
+        # Per-instance LRU caches for query embeddings and search results
+        self._embed_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._compute_query_embedding)
+        self._search = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._search_documents)
     
-    def get_graph_context(self, query: str) -> str:
-        """Get relevant context from the graph database."""
-        with self.driver.session(database=self.database) as session:
-            # Extract roles and skills from the query
-            roles = self._extract_roles(query)
-            skills = self._extract_skills(query)
-            
-            context = []
-            
-            # Get role information
-            if roles:
-                context.append("Role Information:")
-                for role in roles:
-                    role_info = self._get_role_info(session, role)
-                    if role_info:
-                        context.append(role_info)
+    def _session(self):
+        """Return this thread's session, opening it on first use."""
+        session = getattr(self._tls, "session", None)
+        if session is None:
+            # Connections go back to the pool between transactions, so an idle session holds none
+            session = self._tls.session = self.driver.session(database=self.database)
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    def close(self) -> None:
+        """Close every thread's session and the driver."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Neo4j session: {str(e)}")
+        self.driver.close()
+    
+    def _ensure_indexes(self) -> None:
+        """Back role and skill name lookups with indexes and check the planner uses them."""
+        try:
+            with self.driver.session(database=self.database) as session:
+                # Uniqueness constraints create the backing range indexes
+                for label in ("Role", "Skill"):
+                    session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.name IS UNIQUE").consume()
+                
+                summary = session.run("EXPLAIN " + PATH_CYPHER, from_role="", to_role="").consume()
             
-            # Get skill information
-            if skills:
-                context.append("\nSkill Information:")
-                for skill in skills:
-                    skill_info = self._get_skill_info(session, skill)
-                    if skill_info:
-                        context.append(skill_info)
+            operators = self._plan_operators(summary.plan)
+            if any("IndexSeek" in operator for operator in operators):
+                logger.info("Transition path anchors use an index seek")
+            else:
+                logger.warning(f"Transition path anchors do not use an index: {operators}")
+        except Exception as e:
+            logger.error(f"Failed to ensure graph indexes: {str(e)}")
+    
+    def _warm_graph_cache(self) -> None:
+        """Fill the role and skill caches from disk, or from one query that is then saved."""
+        try:
+            if self._graph_cache_is_fresh():
+                with open(self._graph_cache_file, "rb") as f:
+                    cached = pickle.load(f)
+                self._role_cache.update(cached["roles"])
+                self._skill_cache.update(cached["skills"])
+                logger.info(f"Loaded {len(self._role_cache)} roles and {len(self._skill_cache)} skills from {self._graph_cache_file}")
+                return
             
-            # Get transition paths if multiple roles are mentioned
-            if len(roles) >= 2:
-                context.append("\nTransition Path:")
-                transition_info = self._get_transition_path(session, roles[0], roles[1])
-                if transition_info:
-                    context.append(transition_info)
+            roles_data, skills_data, _ = self._session().execute_read(_graph_context_tx, ROLES, SKILLS, None)
+            for record in roles_data:
+                self._role_cache[record['rn']] = self._format_role_info(record)
+            for record in skills_data:
+                self._skill_cache[record['sn']] = self._format_skill_info(record)
             
-            return "\n".join(context) if context else "No specific roles or skills mentioned in the query."
+            with open(self._graph_cache_file, "wb") as f:
+                pickle.dump({"roles": self._role_cache, "skills": self._skill_cache}, f)
+            logger.info(f"Prefetched {len(self._role_cache)} roles and {len(self._skill_cache)} skills")
+        except Exception as e:
+            logger.error(f"Failed to warm graph cache: {str(e)}")
+    
+    def _graph_cache_is_fresh(self) -> bool:
+        """Whether the cache file is within its TTL and newer than every script that defines the graph."""
+        if not self._graph_cache_file.exists():
+            return False
+        cache_modified = self._graph_cache_file.stat().st_mtime
+        if time.time() - cache_modified > int(os.getenv("GRAPH_CACHE_TTL", "86400")):
+            return False
+        return all(path.stat().st_mtime <= cache_modified for path in GRAPH_CYPHER_DIR.glob("*.cypher"))
+    
+    @staticmethod
+    def _plan_operators(plan: Dict) -> List[str]:
+        """Flatten the operator types of a query plan."""
+        if not plan:
+            return []
+        operators = [plan.get("operatorType", "")]
+        for child in plan.get("children", []):
+            operators.extend(CareerRAG._plan_operators(child))
+        return operators
+    
+    @classmethod
+    def _get_vector_store(cls, embeddings) -> FAISS:
+        """Load and tune the vector store on first use; callers hold the shared lock."""
+        key = str(VECTOR_STORE_DIR.resolve())
+        if key in cls._vector_stores:
+            return cls._vector_stores[key]
+        
+        vector_store = FAISS.load_local(
+            str(VECTOR_STORE_DIR),
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+        cls._use_inner_product(vector_store)
+        
+        # IVF indexes (built for large corpora) only probe a few lists per query
+        if isinstance(vector_store.index, faiss.IndexIVF):
+            vector_store.index.nprobe = int(os.getenv("FAISS_NPROBE", str(IVF_NPROBE)))
+            # Parallelize over both queries and probed lists, so single queries and
+            # batches alike spread across cores
+            vector_store.index.parallel_mode = 2
+        cls._move_index_to_gpu(vector_store)
+        
+        cls._vector_stores[key] = vector_store
+        return vector_store
     
-    def _get_role_info(self, session, role: str) -> str:
-        """Get detailed information about a role."""
-        if role in self._role_cache:
-            return self._role_cache[role]
-        
-        result = session.run("""
-            MATCH (r:Role {name: $role})
-            OPTIONAL MATCH (r)-[rel]->(s:Skill)
-            OPTIONAL MATCH (r)-[:REQUIRES_LEVEL]->(l)
-            RETURN r.name as role,
-                   collect(DISTINCT {skill: s.name, type: type(rel)}) as skills,
-                   collect(DISTINCT l.name) as levels
-        """, role=role)
-        
-        record = result.single()
-        if not record:
-            return f"Role '{role}' not found in the database."
+    @staticmethod
+    def _use_inner_product(vector_store: FAISS) -> None:
+        """Search normalized vectors by inner product, converting legacy flat L2 indexes."""
+        index = vector_store.index
+        if isinstance(index, faiss.IndexFlatL2):
+            # Flat indexes store raw vectors, so they can be rebuilt in place
+            vectors = index.reconstruct_n(0, index.ntotal)
+            faiss.normalize_L2(vectors)
+            index = faiss.IndexFlatIP(index.d)
+            index.add(vectors)
+            vector_store.index = index
+        
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            vector_store.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+    
+    @classmethod
+    def _move_index_to_gpu(cls, vector_store: FAISS) -> None:
+        """Move the FAISS index to the first GPU when faiss-gpu and a device are available."""
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            return
+        
+        try:
+            # The resources must outlive the GPU index
+            if cls._gpu_resources is None:
+                cls._gpu_resources = faiss.StandardGpuResources()
+            vector_store.index = faiss.index_cpu_to_gpu(cls._gpu_resources, 0, vector_store.index)
+            logger.info("FAISS index moved to GPU")
+        except Exception as e:
+            # Not every index type has a GPU implementation
+            logger.warning(f"Keeping FAISS index on CPU: {str(e)}")
+    
+    @staticmethod
+    def _load_precomputed_embeddings() -> Dict[str, np.ndarray]:
+        """Load precomputed query embeddings if they match the embedding model."""
+        if not QUERY_EMBEDDINGS_FILE.exists():
+            return {}
         
+        try:
+            with np.load(QUERY_EMBEDDINGS_FILE) as data:
+                if str(data["model"]) != EMBEDDING_MODEL:
+                    logger.warning(f"Ignoring {QUERY_EMBEDDINGS_FILE}: built with {data['model']}")
+                    return {}
+                return dict(zip(data["queries"].tolist(), data["embeddings"]))
+        except Exception as e:
+            logger.warning(f"Failed to load precomputed query embeddings: {str(e)}")
+            return {}
+    
+    def get_graph_context(self, query: str) -> str:
+        """Get relevant context from the graph database."""
+        # Extract roles and skills from the query
+        roles = self._extract_roles(query)
+        skills = self._extract_skills(query)
+        pair = (roles[0], roles[1]) if len(roles) >= 2 else None
+        
+        # Only fetch what is not cached yet, all in one managed read transaction
+        missing_roles = [role for role in roles if role not in self._role_cache]
+        missing_skills = [skill for skill in skills if skill not in self._skill_cache]
+        missing_pair = pair if pair and pair not in self._path_cache else None
+        if missing_roles or missing_skills or missing_pair:
+            roles_data, skills_data, path_data = self._session().execute_read(
+                _graph_context_tx, missing_roles, missing_skills, missing_pair
+            )
+            
+            # Cache the results
+            for record in roles_data:
+                self._role_cache[record['rn']] = self._format_role_info(record)
+            for record in skills_data:
+                self._skill_cache[record['sn']] = self._format_skill_info(record)
+            if path_data:
+                self._path_cache[missing_pair] = self._format_transition(missing_pair, path_data)
+        
+        context = []
+        
+        # Get role information
+        if roles:
+            context.append("Role Information:")
+            context.extend(
+                self._role_cache.get(role, f"Role '{role}' not found in the database.") for role in roles
+            )
+        
+        # Get skill information
+        if skills:
+            context.append("\nSkill Information:")
+            context.extend(
+                self._skill_cache.get(skill, f"Skill '{skill}' not found in the database.") for skill in skills
+            )
+        
+        # Get transition paths if multiple roles are mentioned
+        if pair:
+            context.append("\nTransition Path:")
+            context.append(self._path_cache.get(
+                pair, f"No direct transition path found from {pair[0]} to {pair[1]}."
+            ))
+        
+        return "\n".join(context) if context else "No specific roles or skills mentioned in the query."
+    
+    @staticmethod
+    def _format_role_info(record: Dict) -> str:
+        """Format a role record from the graph."""
         info = [f"\nRole: {record['role']}"]
         
         # Add levels
         levels = record['levels']
         if levels and levels[0] is not None:
             info.append("Career Levels:")
-            for level in levels:
-                info.append(f"- {level}")
+            info.extend(f"- {level}" for level in levels)
         
         # Add skills
         skills = record['skills']
         if skills and skills[0]['skill'] is not None:
             info.append("\nRequired Skills:")
-            for skill in skills:
-                info.append(f"- {skill['skill']}")
+            info.extend(f"- {skill['skill']}" for skill in skills)
         
-        # Cache the result
-        self._role_cache[role] = "\n".join(info)
-        return self._role_cache[role]
+        return "\n".join(info)
     
-    def _get_skill_info(self, session, skill: str) -> str:
-        """Get detailed information about a skill."""
-        if skill in self._skill_cache:
-            return self._skill_cache[skill]
-        
-        result = session.run("""
-            MATCH (s:Skill {name: $skill})
-            OPTIONAL MATCH (r:Role)-[rel]->(s)
-            RETURN s.name as skill,
-                   collect(DISTINCT {role: r.name, type: type(rel)}) as roles
-        """, skill=skill)
-        
-        record = result.single()
-        if not record:
-            return f"Skill '{skill}' not found in the database."
-        
+    @staticmethod
+    def _format_skill_info(record: Dict) -> str:
+        """Format a skill record from the graph."""
         info = [f"\nSkill: {record['skill']}"]
         
         # Add roles that require this skill
         roles = record['roles']
         if roles and roles[0]['role'] is not None:
             info.append("\nRequired by Roles:")
-            for role in roles:
-                info.append(f"- {role['role']}")
+            info.extend(f"- {role['role']}" for role in roles)
         
-        # Cache the result
-        self._skill_cache[skill] = "\n".join(info)
-        return self._skill_cache[skill]
+        return "\n".join(info)
     
-    def _get_transition_path(self, session, from_role: str, to_role: str) -> str:
-        """Get detailed transition path between roles."""
-        result = session.run("""
-            MATCH path = shortestPath((r1:Role {name: $from_role})-[*..5]->(r2:Role {name: $to_role}))
-            RETURN [node in nodes(path) | node.name] as path,
-                   [rel in relationships(path) | type(rel)] as relationships
-        """, from_role=from_role, to_role=to_role)
-        
-        record = result.single()
-        if not record:
-            return f"No direct transition path found from {from_role} to {to_role}."
-        
+    def _format_transition(self, pair: Tuple[str, str], record: Dict) -> str:
+        """Format a transition path with the skill changes of each step."""
+        from_role, to_role = pair
         path = record['path']
         relationships = record['relationships']
+        skills = record['skills']
         
         info = [f"\nTransition from {from_role} to {to_role}:"]
         
@@ -168,31 +430,20 @@ class CareerRAG:
             info.append(f"Relationship: {rel_type}")
             
             # Get skill differences
-            skill_diff = self._get_skill_differences(session, current_role, next_role)
+            skill_diff = self._diff_skills(skills[i], skills[i + 1])
             if skill_diff:
                 info.append("Skill Changes:")
-                for skill_type, skills in skill_diff.items():
-                    if skills:
-                        info.append(f"- {skill_type}: {', '.join(skills)}")
+                for skill_type, skill_names in skill_diff.items():
+                    if skill_names:
+                        info.append(f"- {skill_type}: {', '.join(skill_names)}")
         
         return "\n".join(info)
     
-    def _get_skill_differences(self, session, role1: str, role2: str) -> Dict[str, List[str]]:
-        """Get skill differences between two roles."""
-        result = session.run("""
-            MATCH (r1:Role {name: $role1})-[:REQUIRES_SKILL]->(s1:Skill)
-            MATCH (r2:Role {name: $role2})-[:REQUIRES_SKILL]->(s2:Skill)
-            RETURN collect(DISTINCT s1.name) as skills1,
-                   collect(DISTINCT s2.name) as skills2
-        """, role1=role1, role2=role2)
-        
-        record = result.single()
-        if not record:
-            return {}
-        
-        skills1 = set(record['skills1'])
-        skills2 = set(record['skills2'])
-        
+    @staticmethod
+    def _diff_skills(skills1: List[str], skills2: List[str]) -> Dict[str, List[str]]:
+        """Compare the skill sets of two roles."""
+        skills1 = set(skills1)
+        skills2 = set(skills2)
         return {
             "Skills to Learn": list(skills2 - skills1),
             "Skills to Maintain": list(skills1 & skills2),
@@ -201,78 +452,109 @@ class CareerRAG:
     
     def _extract_roles(self, query: str) -> List[str]:
         """Extract role names from the query using improved matching."""
-        # This is a simple implementation. In a real system, you might want to use NLP
-        roles = ["BI Engineer", "Data Engineer", "Data Analyst", "Machine Learning Engineer"]
         query_lower = query.lower()
         
         # Check for exact matches first
-        exact_matches = [role for role in roles if role.lower() in query_lower]
+        exact_matches = self._role_matcher(query_lower)
         if exact_matches:
             return exact_matches
         
-        # Check for partial matches
-        partial_matches = []
-        for role in roles:
-            # Split role into words and check if all words are present
-            role_words = role.lower().split()
-            if all(word in query_lower for word in role_words):
-                partial_matches.append(role)
-        
-        return partial_matches
+        # Check for partial matches: all words of the role are present
+        return [
+            role for role, role_words in self._roles_lc
+            if all(word in query_lower for word in role_words)
+        ]
     
     def _extract_skills(self, query: str) -> List[str]:
         """Extract skill names from the query."""
-        # This is a simple implementation. In a real system, you might want to use NLP
-        skills = [
-            "Python", "SQL", "Power BI", "Tableau", "Data Warehousing",
-            "ETL Processes", "Statistics", "Machine Learning", "Deep Learning",
-            "MLOps", "Cloud Platforms"
-        ]
-        query_lower = query.lower()
-        return [skill for skill in skills if skill.lower() in query_lower]
+        return self._skill_matcher(query.lower())
     
     def get_relevant_documents(self, query: str, k: int = 3) -> list:
         """Get relevant documents from the vector store."""
-        return self.vector_store.similarity_search(query, k=k)
+        return list(self._search(query, k))
+    
+    def get_relevant_documents_batch(self, queries: List[str], k: int = 3) -> List[list]:
+        """Get relevant documents for several queries with one embedding pass and one search."""
+        if not queries:
+            return []
+        
+        # Only embed the queries that were not precomputed
+        missing = [query for query in queries if query not in self._precomputed_embs]
+        embedded = dict(zip(missing, self.embeddings.embed_documents(missing))) if missing else {}
+        query_vectors = np.ascontiguousarray(
+            [self._precomputed_embs[query] if query in self._precomputed_embs else embedded[query] for query in queries],
+            dtype=np.float32
+        )
+        if self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(query_vectors)
+        _, indices = self.vector_store.index.search(query_vectors, k)
+        
+        docstore = self.vector_store.docstore
+        index_to_id = self.vector_store.index_to_docstore_id
+        # -1 marks an empty result slot
+        return [[docstore.search(index_to_id[i]) for i in row if i != -1] for row in indices]
+    
+    def _compute_query_embedding(self, query: str) -> Tuple[float, ...]:
+        """Embed a query; a tuple so cached vectors cannot be mutated."""
+        if query in self._precomputed_embs:
+            vector = np.array(self._precomputed_embs[query], dtype=np.float32)
+        else:
+            vector = np.array(self.embeddings.embed_query(query), dtype=np.float32)
+        # Inner product only ranks by cosine similarity for unit vectors
+        if self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(vector.reshape(1, -1))
+        return tuple(vector.tolist())
+    
+    def _search_documents(self, query: str, k: int) -> tuple:
+        """Search the vector store with the cached query embedding."""
+        return tuple(self.vector_store.similarity_search_by_vector(list(self._embed_query(query)), k=k))
     
     def answer_question(self, query: str) -> str:
         """Answer a question using both graph and vector store data."""
         # Get context from both sources
         graph_context = self.get_graph_context(query)
         relevant_docs = self.get_relevant_documents(query)
-        
+        return self._format_answer(graph_context, relevant_docs)
+    
+    def answer_questions(self, queries: List[str]) -> List[str]:
+        """Answer several questions, retrieving documents for all of them in one batch."""
+        docs_per_query = self.get_relevant_documents_batch(queries)
+        return [
+            self._format_answer(self.get_graph_context(query), relevant_docs)
+            for query, relevant_docs in zip(queries, docs_per_query)
+        ]
+    
+    @staticmethod
+    def _format_answer(graph_context: str, relevant_docs: list) -> str:
+        """Combine graph context and retrieved documents into an answer."""
         # Combine the information
-        answer = f"Based on the career graph and available resources:\n\n"
+        parts = ["Based on the career graph and available resources:", ""]
         
         # Add graph context
-        answer += graph_context + "\n\n"
+        parts.extend([graph_context, ""])
         
         # Add relevant documents
-        answer += "Additional Resources:\n"
-        for i, doc in enumerate(relevant_docs, 1):
-            answer += f"\nResource {i}:\n"
-            answer += f"Source: {doc.metadata.get('source', 'unknown')}\n"
-            answer += f"Content: {doc.page_content[:200]}...\n"
+        parts.append("Additional Resources:")
+        # Slicing copies only the preview characters, never the whole document
+        parts.extend(
+            f"\nResource {i}:\n"
+            f"Source: {doc.metadata.get('source', 'unknown')}\n"
+            f"Content: {doc.page_content[:RESOURCE_PREVIEW_CHARS]}..."
+            for i, doc in enumerate(relevant_docs, 1)
+        )
         
-        return answer
+        # Trailing empty part keeps the final newline
+        parts.append("")
+        return "\n".join(parts)
 
 def main():
     """Test the RAG pipeline with sample questions."""
     try:
         rag = CareerRAG()
         
-        # Test questions
-        questions = [
-            "What skills do I need to become a Data Engineer?",
-            "How can I transition from BI Engineer to Data Engineer?",
-            "What are the key differences between Data Analyst and Data Engineer roles?",
-            "What skills should I focus on to move from Data Analyst to Machine Learning Engineer?",
-            "Tell me about the Python skills needed for data roles"
-        ]
-        
-        for question in questions:
+        answers = rag.answer_questions(TEST_QUESTIONS)
+        for question, answer in zip(TEST_QUESTIONS, answers):
             logger.info(f"\nQuestion: {question}")
-            answer = rag.answer_question(question)
             logger.info(f"\nAnswer:\n{answer}")
             logger.info("-" * 80)
             
@@ -281,7 +563,7 @@ def main():
         raise
     finally:
         if 'rag' in locals():
-            rag.driver.close()
+            rag.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -10,7 +10,11 @@ setup(
         "langchain-huggingface>=0.0.5",
         "sentence-transformers>=2.2.2",
         "faiss-cpu>=1.7.4",
-        "neo4j>=5.0.0",
+        "onnxruntime>=1.16.0",
+        "pyahocorasick>=2.0.0",
+        "semantic-text-splitter>=0.13.0",
+        "neo4j>=5.8.0",
+        "orjson>=3.9.0",
         "python-dotenv>=1.0.0",
         "streamlit>=1.30.0",
         "huggingface-hub>=0.20.0"